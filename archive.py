@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Архив отправленных грантов (SQLite)
+- Полные записи опубликованных грантов
+- Индексированная таблица напоминаний о дедлайнах
+"""
+import os
+import json
+import math
+import time
+import sqlite3
+import logging
+from contextlib import closing
+from typing import List, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR      = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DB_FILE = os.path.join(SCRIPT_DIR, "grants.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS grants (
+    id                TEXT PRIMARY KEY,
+    title             TEXT NOT NULL,
+    organizer         TEXT,
+    source            TEXT,
+    direction         TEXT,
+    annual_amount_min INTEGER NOT NULL DEFAULT 0,
+    details_url       TEXT,
+    deadline_info     TEXT,
+    deadline_ts       REAL,
+    posted_at         REAL NOT NULL,
+    data              TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS grants_posted_at ON grants(posted_at);
+CREATE INDEX IF NOT EXISTS grants_direction ON grants(direction, posted_at);
+CREATE INDEX IF NOT EXISTS grants_source ON grants(source, posted_at);
+
+CREATE TABLE IF NOT EXISTS reminders (
+    grant_id  TEXT NOT NULL REFERENCES grants(id),
+    days_left INTEGER NOT NULL,
+    due_ts    REAL NOT NULL,
+    sent      INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (grant_id, days_left)
+);
+-- Частичный индекс: ближайшее напоминание ищется за O(log n) без скана архива
+CREATE INDEX IF NOT EXISTS reminders_due ON reminders(due_ts) WHERE sent = 0;
+"""
+
+DAY = 24 * 60 * 60
+
+# WAL держит индекс в разделяемой памяти и не работает по сети: общий том
+# возможен только как локальный диск одного хоста
+NETWORK_FS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "fuse.sshfs", "glusterfs", "ceph", "afs"}
+
+# ─── Подключение ──────────────────────────────────────────────────────────────
+
+def filesystem_type(path: str) -> str:
+    """Тип ФС по /proc/mounts (только Linux; иначе пустая строка)."""
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return ""
+    real = os.path.realpath(path)
+    best, fstype = "", ""
+    for point, kind in mounts:
+        point = point.replace("\\040", " ")
+        if (real == point or real.startswith(point.rstrip("/") + "/")) and len(point) > len(best):
+            best, fstype = point, kind
+    return fstype
+
+_checked_dirs = set()
+
+def connect(path: str = ARCHIVE_DB_FILE) -> sqlite3.Connection:
+    folder = os.path.dirname(os.path.abspath(path))
+    if folder not in _checked_dirs:
+        fstype = filesystem_type(folder)
+        if fstype in NETWORK_FS:
+            raise RuntimeError(
+                f"{path}: сетевая ФС ({fstype}) не поддерживается — SQLite WAL "
+                "работает только на локальном диске"
+            )
+        _checked_dirs.add(folder)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+# ─── Запись ───────────────────────────────────────────────────────────────────
+
+def archive_grants(grants: List[Dict], remind_days: List[int], now: float = None) -> int:
+    """Сохраняет отправленные гранты и планирует напоминания «осталось N дней»."""
+    now = now or time.time()
+    added = 0
+    try:
+        with closing(connect()) as conn, conn:
+            for g in grants:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO grants (id, title, organizer, source, direction, "
+                    "annual_amount_min, details_url, deadline_info, deadline_ts, posted_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        g["id"], g["title"], g.get("organizer", ""),
+                        g.get("source", g.get("organizer", "")), g.get("direction", ""),
+                        g.get("annual_amount_min", 0), g.get("details_url", ""),
+                        g.get("deadline_info", ""), g.get("deadline_ts"), now,
+                        json.dumps(g, ensure_ascii=False),
+                    ),
+                )
+                if cur.rowcount == 0:
+                    continue
+                added += 1
+                deadline = g.get("deadline_ts")
+                if not deadline:
+                    continue
+                conn.executemany(
+                    "INSERT OR IGNORE INTO reminders (grant_id, days_left, due_ts) VALUES (?, ?, ?)",
+                    [(g["id"], d, deadline - d * DAY) for d in remind_days if deadline - d * DAY > now],
+                )
+        logger.info(f"В архив добавлено грантов: {added}")
+    except Exception as e:
+        logger.error(f"Ошибка записи архива: {e}")
+    return added
+
+# ─── Напоминания ──────────────────────────────────────────────────────────────
+
+def next_reminder_ts() -> Optional[float]:
+    """Время ближайшего неотправленного напоминания (None — напоминаний нет)."""
+    try:
+        with closing(connect()) as conn:
+            row = conn.execute("SELECT MIN(due_ts) FROM reminders WHERE sent = 0").fetchone()
+            return row[0]
+    except Exception as e:
+        logger.error(f"Ошибка чтения напоминаний: {e}")
+        return None
+
+def pop_due_reminders(now: float = None, limit: int = 100) -> List[Dict]:
+    """Забирает наступившие напоминания и помечает их отправленными.
+
+    Если бот простаивал, по гранту отправляется одно напоминание с фактическим
+    остатком дней; напоминания по прошедшим дедлайнам просто гасятся.
+    """
+    now = now or time.time()
+    latest: Dict[str, Dict] = {}
+    try:
+        with closing(connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT r.grant_id, r.days_left, g.title, g.organizer, g.details_url, g.deadline_ts "
+                "FROM reminders r JOIN grants g ON g.id = r.grant_id "
+                "WHERE r.sent = 0 AND r.due_ts <= ? ORDER BY r.due_ts LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            for r in rows:
+                cur = conn.execute(
+                    "UPDATE reminders SET sent = 1 WHERE grant_id = ? AND days_left = ? AND sent = 0",
+                    (r["grant_id"], r["days_left"]),
+                )
+                if not cur.rowcount or r["deadline_ts"] <= now:
+                    continue
+                prev = latest.get(r["grant_id"])
+                if prev is None or r["days_left"] < prev["days_left"]:
+                    latest[r["grant_id"]] = dict(r)
+    except Exception as e:
+        logger.error(f"Ошибка выборки напоминаний: {e}")
+    for r in latest.values():
+        r["days_left"] = math.ceil((r["deadline_ts"] - now) / DAY)
+    return list(latest.values())
+
+def format_reminder(r: Dict) -> str:
+    deadline = time.strftime("%d.%m.%Y", time.localtime(r["deadline_ts"]))
+    text = (
+        f"⏰ <b>Осталось {r['days_left']} дн.</b> до окончания приёма заявок\n\n"
+        f"<b>{r['title']}</b>\n"
+        f"👤 <b>Организатор:</b> {r['organizer']}\n"
+        f"⏳ <b>Дедлайн:</b> {deadline}\n"
+    )
+    if r.get("details_url"):
+        text += f"🔗 <a href=\"{r['details_url']}\">Подробнее →</a>\n"
+    return text
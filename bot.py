@@ -5,9 +5,13 @@
 """
 import os
 import sys
+import time
+import shlex
 import logging
+import tempfile
 import asyncio
 from datetime import time as dtime
+from typing import Optional
 
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import (
@@ -17,6 +21,10 @@ from telegram.ext import (
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from parser import run_parser, load_settings, save_settings
+from profiling import RunProfiler
+from archive import next_reminder_ts, pop_due_reminders, format_reminder
+from export import FORMATS, export_grants, default_export_name
+from coordination import is_leader, clear_claims, LEADER_LEASE_TTL
 
 # ─── Переменные окружения ──────────────────────────────────────────────────────
 TOKEN      = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
@@ -93,6 +101,7 @@ async def cmd_check(update: Update, context: ContextTypes.DEFAULT_TYPE):
         count = await loop.run_in_executor(
             None, lambda: run_parser(settings, CHANNEL_ID)
         )
+        schedule_reminders(context.job_queue)
         if count > 0:
             await update.message.reply_text(
                 f"✅ Готово! Отправлено в канал новых грантов: <b>{count}</b>",
@@ -109,6 +118,92 @@ async def cmd_check(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"❌ Ошибка: {str(e)[:200]}", reply_markup=MAIN_KEYBOARD)
 
 
+async def cmd_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Запускает парсер с профилированием этапов и присылает сводку."""
+    if not is_admin(update):
+        return
+    if not CHANNEL_ID:
+        await update.message.reply_text("❌ Не задана переменная TELEGRAM_CHANNEL_ID в BotHost!")
+        return
+    await update.message.reply_text("⏳ Запускаю парсер с профилированием...", reply_markup=MAIN_KEYBOARD)
+    try:
+        settings = load_settings()
+        profiler = RunProfiler(enabled=True)
+        loop = asyncio.get_event_loop()
+        count = await loop.run_in_executor(
+            None, lambda: run_parser(settings, CHANNEL_ID, profiler)
+        )
+        schedule_reminders(context.job_queue)
+        if not profiler.summary_file:
+            await update.message.reply_text("⚠️ Профиль не сохранён", reply_markup=MAIN_KEYBOARD)
+            return
+        with open(profiler.summary_file, "rb") as f:
+            await update.message.reply_document(
+                f,
+                caption=f"📊 Профиль запуска (грантов: {count})\n<code>{profiler.run_dir}</code>",
+                parse_mode="HTML",
+                reply_markup=MAIN_KEYBOARD,
+            )
+    except Exception as e:
+        logger.exception("Ошибка профилирования")
+        await update.message.reply_text(f"❌ Ошибка: {str(e)[:200]}", reply_markup=MAIN_KEYBOARD)
+
+
+EXPORT_FILTERS = {
+    "since": str, "until": str, "source": str, "direction": str,
+    "min": int, "max": int,
+}
+SMART_QUOTES = str.maketrans({c: '"' for c in "«»“”„"})
+
+
+async def cmd_export(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Выгружает архив грантов и присылает файл (.jsonl.gz или .csv.gz)."""
+    if not is_admin(update):
+        return
+    fmt, filters_ = "jsonl", {}
+    try:
+        # context.args режет по пробелам; значения с пробелами берутся в кавычки.
+        # Клиенты Telegram подменяют кавычки «ёлочками» и “лапками” — приводим к ASCII
+        text = update.message.text.translate(SMART_QUOTES)
+        for arg in shlex.split(text)[1:]:
+            if arg in FORMATS:
+                fmt = arg
+                continue
+            key, _, value = arg.partition("=")
+            if key not in EXPORT_FILTERS or not value:
+                raise ValueError(arg)
+            value = EXPORT_FILTERS[key](value)
+            filters_[{"min": "min_amount", "max": "max_amount"}.get(key, key)] = value
+    except ValueError:
+        await update.message.reply_text(
+            "❌ Пример: <code>/export csv since=2026-01-01 direction=\"Новые материалы\" min=10000000</code>\n"
+            "Фильтры: since, until, source, direction, min, max",
+            parse_mode="HTML",
+            reply_markup=MAIN_KEYBOARD,
+        )
+        return
+
+    await update.message.reply_text("⏳ Готовлю выгрузку...", reply_markup=MAIN_KEYBOARD)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, default_export_name(fmt, True))
+            loop = asyncio.get_event_loop()
+            count = await loop.run_in_executor(
+                None, lambda: export_grants(path, fmt, True, **filters_)
+            )
+            with open(path, "rb") as f:
+                await update.message.reply_document(
+                    f,
+                    filename=os.path.basename(path),
+                    caption=f"📦 Выгружено грантов: <b>{count}</b>",
+                    parse_mode="HTML",
+                    reply_markup=MAIN_KEYBOARD,
+                )
+    except Exception as e:
+        logger.exception("Ошибка выгрузки")
+        await update.message.reply_text(f"❌ Ошибка: {str(e)[:200]}", reply_markup=MAIN_KEYBOARD)
+
+
 async def cmd_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not is_admin(update):
         return
@@ -192,8 +287,11 @@ async def handle_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "<b>Команды:</b>\n"
             "/start — главное меню\n"
             "/check — запустить парсер\n"
-            "/setamount 10000000 — изменить минимум\n\n"
-            "⏰ Парсер запускается автоматически каждый день в 12:00 МСК",
+            "/setamount 10000000 — изменить минимум\n"
+            "/profile — запуск с профилированием\n"
+            "/export csv since=2026-01-01 — выгрузка архива грантов\n\n"
+            "⏰ Парсер запускается автоматически каждый день в 12:00 МСК\n"
+            "🔔 О приближении дедлайна бот напомнит в канале",
             parse_mode="HTML",
             reply_markup=MAIN_KEYBOARD,
         )
@@ -209,10 +307,10 @@ async def cmd_reset(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not is_admin(update):
         return
     try:
-        import json, os
         from parser import SENT_GRANTS_FILE
         if os.path.exists(SENT_GRANTS_FILE):
             os.remove(SENT_GRANTS_FILE)
+        if clear_claims():
             await update.message.reply_text(
                 "✅ История очищена! Теперь нажми 🔍 Запустить парсер — придут все гранты заново.",
                 reply_markup=MAIN_KEYBOARD
@@ -230,6 +328,9 @@ async def job_daily(context: ContextTypes.DEFAULT_TYPE):
     if not CHANNEL_ID:
         logger.warning("TELEGRAM_CHANNEL_ID не задан — автозапуск пропущен")
         return
+    if not is_leader():
+        logger.info("Автозапуск выполняет другой экземпляр бота")
+        return
     logger.info("⏰ Автозапуск парсера")
     try:
         settings = load_settings()
@@ -237,11 +338,66 @@ async def job_daily(context: ContextTypes.DEFAULT_TYPE):
         count = await loop.run_in_executor(
             None, lambda: run_parser(settings, CHANNEL_ID)
         )
+        schedule_reminders(context.job_queue)
         logger.info(f"✅ Автозапуск завершён. Грантов: {count}")
     except Exception as e:
         logger.exception("Ошибка автозапуска")
 
 
+# ─── Напоминания о дедлайнах ──────────────────────────────────────────────────
+
+REMINDER_JOB = "deadline_reminders"
+
+
+def schedule_reminders(job_queue, min_delay: float = 0.0):
+    """Ставит единственную задачу на время ближайшего напоминания."""
+    for job in job_queue.get_jobs_by_name(REMINDER_JOB):
+        job.schedule_removal()
+    due = next_reminder_ts()
+    if due is None:
+        return
+    job_queue.run_once(job_reminders, when=max(min_delay, due - time.time()), name=REMINDER_JOB)
+
+
+async def job_reminders(context: ContextTypes.DEFAULT_TYPE):
+    if not CHANNEL_ID:
+        logger.warning("TELEGRAM_CHANNEL_ID не задан — напоминания пропущены")
+        return
+    if not is_leader():
+        # Напоминания рассылает лидер; проверим снова, когда его аренда может истечь
+        schedule_reminders(context.job_queue, min_delay=LEADER_LEASE_TTL)
+        return
+    loop = asyncio.get_event_loop()
+    due = await loop.run_in_executor(None, pop_due_reminders)
+    for r in due:
+        try:
+            await context.bot.send_message(
+                CHANNEL_ID, format_reminder(r),
+                parse_mode="HTML", disable_web_page_preview=True,
+            )
+        except Exception:
+            logger.exception("Ошибка отправки напоминания")
+    logger.info(f"🔔 Отправлено напоминаний: {len(due)}")
+    schedule_reminders(context.job_queue)
+
+
+def scheduled_reminder_ts(job_queue) -> Optional[float]:
+    times = [job.next_t.timestamp() for job in job_queue.get_jobs_by_name(REMINDER_JOB) if job.next_t]
+    return min(times) if times else None
+
+
+async def job_leader_heartbeat(context: ContextTypes.DEFAULT_TYPE):
+    # Пока лидер жив, аренда продлевается и остальные экземпляры не запускают задачи
+    loop = asyncio.get_event_loop()
+    if not await loop.run_in_executor(None, is_leader):
+        return
+    # Напоминания добавляют и парсер из cron, и другие экземпляры — подхватываем их
+    due = await loop.run_in_executor(None, next_reminder_ts)
+    scheduled = scheduled_reminder_ts(context.job_queue)
+    if due is not None and (scheduled is None or due < scheduled - 1):
+        schedule_reminders(context.job_queue)
+
+
 # ─── Запуск ───────────────────────────────────────────────────────────────────
 
 def main():
@@ -273,9 +429,13 @@ def main():
     app.add_handler(CommandHandler("status",    cmd_status))
     app.add_handler(CommandHandler("setamount", cmd_setamount))
     app.add_handler(CommandHandler("reset",     cmd_reset))
+    app.add_handler(CommandHandler("profile",   cmd_profile))
+    app.add_handler(CommandHandler("export",    cmd_export))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_buttons))
 
+    app.job_queue.run_repeating(job_leader_heartbeat, interval=LEADER_LEASE_TTL / 3, first=0)
     app.job_queue.run_daily(job_daily, time=dtime(hour=9, minute=0))
+    schedule_reminders(app.job_queue)
 
     logger.info("✅ Polling запущен...")
     app.run_polling(drop_pending_updates=False, allowed_updates=Update.ALL_TYPES)
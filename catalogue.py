@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Каталог статических грантов (Стратегия МГТУ 2030)
+- Загружается из JSON-файла, перечитывается при изменении mtime
+- Индексы по сумме, направлению и организатору
+"""
+import os
+import json
+import bisect
+import logging
+import threading
+from typing import List, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def split_organizers(organizer: str) -> List[str]:
+    return [o.strip() for o in organizer.split(",") if o.strip()]
+
+def entry_error(g) -> Optional[str]:
+    """Причина, по которой запись нельзя индексировать (None — запись годится)."""
+    if not isinstance(g, dict):
+        return "запись не объект"
+    if not isinstance(g.get("title"), str) or not g["title"]:
+        return "нет названия"
+    amount = g.get("annual_amount_min", 0)
+    if not isinstance(amount, int) or isinstance(amount, bool):
+        return f"annual_amount_min не целое: {amount!r}"
+    for key in ("direction", "organizer"):
+        if not isinstance(g.get(key, ""), str):
+            return f"{key} не строка: {g[key]!r}"
+    return None
+
+
+class StaticCatalogue:
+    """Статические гранты с отсортированными индексами.
+
+    Каждый индекс — список (annual_amount_min, title), отсортированный по сумме,
+    поэтому фильтр по порогу — это bisect плюс срез результата.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+        self._grants: Dict[str, Dict] = {}
+        self._by_amount: List[Tuple[int, str]] = []
+        self._by_direction: Dict[str, List[Tuple[int, str]]] = {}
+        self._by_organizer: Dict[str, List[Tuple[int, str]]] = {}
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._grants)
+
+    # ─── Загрузка ─────────────────────────────────────────────────────────────
+
+    def refresh(self):
+        """Перечитывает файл, если он изменился, и обновляет только затронутые записи."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            if self._mtime is None:
+                logger.error(f"Каталог грантов недоступен: {e}")
+                self._mtime = 0.0
+            return
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+                if not isinstance(entries, list):
+                    raise ValueError("ожидался список грантов")
+                fresh = {}
+                for i, g in enumerate(entries):
+                    error = entry_error(g)
+                    if error:
+                        # Ошибка типа всплыла бы в insort посреди обновления индексов
+                        logger.warning(f"Каталог грантов: запись #{i} пропущена — {error}")
+                        continue
+                    if g["title"] in fresh:
+                        # Название — ключ индексов; дубль молча затёр бы запись
+                        logger.warning(f"Каталог грантов: дубль названия пропущен — {g['title']}")
+                        continue
+                    fresh[g["title"]] = g
+            except Exception as e:
+                # Битый файл не должен ронять парсер — работаем со старыми индексами
+                logger.error(f"Ошибка чтения каталога грантов: {e}")
+                self._mtime = mtime
+                return
+
+            removed = [t for t, g in self._grants.items() if fresh.get(t) != g]
+            added = [t for t, g in fresh.items() if self._grants.get(t) != g]
+            for title in removed:
+                self._unindex(self._grants.pop(title))
+            for title in added:
+                self._grants[title] = fresh[title]
+                self._index(fresh[title])
+            self._mtime = mtime
+            logger.info(f"Каталог грантов: {len(self._grants)} (+{len(added)}/-{len(removed)})")
+
+    def _keys(self, g: Dict):
+        yield self._by_amount
+        yield self._by_direction.setdefault(g.get("direction", ""), [])
+        for org in split_organizers(g.get("organizer", "")):
+            yield self._by_organizer.setdefault(org, [])
+
+    def _index(self, g: Dict):
+        entry = (g.get("annual_amount_min", 0), g["title"])
+        for index in self._keys(g):
+            bisect.insort(index, entry)
+
+    def _unindex(self, g: Dict):
+        entry = (g.get("annual_amount_min", 0), g["title"])
+        for index in self._keys(g):
+            i = bisect.bisect_left(index, entry)
+            if i < len(index) and index[i] == entry:
+                del index[i]
+
+    # ─── Выборка ──────────────────────────────────────────────────────────────
+
+    def filter(self, min_amount: int = 0, direction: str = None, organizer: str = None) -> List[Dict]:
+        """Гранты с annual_amount_min >= min_amount, от крупных к мелким."""
+        self.refresh()
+        with self._lock:
+            index = self._by_amount
+            if direction is not None:
+                index = self._by_direction.get(direction, [])
+            if organizer is not None:
+                by_org = self._by_organizer.get(organizer, [])
+                if direction is None or len(by_org) < len(index):
+                    index = by_org
+            start = bisect.bisect_left(index, (min_amount, ""))
+            result = [self._grants[title] for _, title in reversed(index[start:])]
+        if direction is not None:
+            result = [g for g in result if g.get("direction") == direction]
+        if organizer is not None:
+            result = [g for g in result if organizer in split_organizers(g.get("organizer", ""))]
+        return result
+
+    def directions(self) -> List[str]:
+        self.refresh()
+        return sorted(d for d, index in self._by_direction.items() if index)
+
+    def organizers(self) -> List[str]:
+        self.refresh()
+        return sorted(o for o, index in self._by_organizer.items() if index)
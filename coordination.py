@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Координация нескольких процессов бота/парсера через общий SQLite (WAL)
+- Аренда источников и лидерства с heartbeat и истечением срока
+- Атомарный захват грантов при дедупликации с подтверждением после отправки
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+from contextlib import closing, contextmanager
+from typing import Iterable, List, Set
+
+from archive import connect as connect_archive
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+# Лидерство принадлежит процессу целиком, остальные аренды — конкретному держателю
+LEADER_TOKEN = f"{WORKER_ID}:{uuid.uuid4().hex}"
+
+SOURCE_LEASE_TTL = 120
+LEADER_LEASE     = "leader"
+LEADER_LEASE_TTL = 90
+# Неподтверждённый захват старше этого считается брошенным (процесс упал до отправки)
+CLAIM_TTL        = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name       TEXT PRIMARY KEY,
+    owner      TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sent_grants (
+    id         TEXT PRIMARY KEY,
+    claimed_by TEXT NOT NULL,
+    claimed_at REAL NOT NULL,
+    confirmed  INTEGER NOT NULL DEFAULT 1
+);
+"""
+
+_migrated = False
+
+def connect():
+    global _migrated
+    conn = connect_archive()
+    conn.executescript(SCHEMA)
+    if not _migrated:
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(sent_grants)")}
+        if "confirmed" not in columns:
+            # Записи из старой схемы уже отправлены — DEFAULT 1 подтверждает их
+            conn.execute("ALTER TABLE sent_grants ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 1")
+            conn.commit()
+        _migrated = True
+    return conn
+
+# ─── Аренда ───────────────────────────────────────────────────────────────────
+
+def new_lease_token() -> str:
+    return f"{WORKER_ID}:{uuid.uuid4().hex}"
+
+def acquire_lease(name: str, ttl: float, owner: str) -> bool:
+    """Берёт или продлевает аренду держателя owner. False — аренда у другого живого держателя."""
+    now = time.time()
+    try:
+        with closing(connect()) as conn, conn:
+            cur = conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (name, owner, now + ttl, now),
+            )
+            return cur.rowcount == 1
+    except Exception as e:
+        logger.error(f"Ошибка аренды {name}: {e}")
+        return False
+
+def release_lease(name: str, owner: str):
+    try:
+        with closing(connect()) as conn, conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+    except Exception as e:
+        logger.error(f"Ошибка освобождения аренды {name}: {e}")
+
+@contextmanager
+def leased(name: str, ttl: float = SOURCE_LEASE_TTL):
+    """Держит аренду на время блока, продлевая её в фоне каждые ttl/3 секунд.
+
+    Каждый вход получает свой токен, поэтому потоки одного процесса тоже
+    исключают друг друга.
+    """
+    token = new_lease_token()
+    if not acquire_lease(name, ttl, token):
+        yield False
+        return
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(ttl / 3):
+            if not acquire_lease(name, ttl, token):
+                logger.warning(f"Аренда {name} потеряна")
+                return
+
+    thread = threading.Thread(target=heartbeat, name=f"lease:{name}", daemon=True)
+    thread.start()
+    try:
+        yield True
+    finally:
+        stop.set()
+        thread.join()
+        release_lease(name, token)
+
+def is_leader() -> bool:
+    """Продлевает аренду лидера; задачи по расписанию выполняет только лидер."""
+    return acquire_lease(LEADER_LEASE, LEADER_LEASE_TTL, LEADER_TOKEN)
+
+# ─── Дедупликация ─────────────────────────────────────────────────────────────
+
+def claim_grants(ids: Iterable[str]) -> Set[str]:
+    """Атомарно захватывает гранты для отправки; возвращает те, что захватил этот процесс.
+
+    Захват не подтверждён, пока не вызван confirm_claims. Брошенный захват
+    старше CLAIM_TTL может забрать другой процесс.
+    """
+    claimed = set()
+    now = time.time()
+    with closing(connect()) as conn, conn:
+        for gid in ids:
+            cur = conn.execute(
+                "INSERT INTO sent_grants (id, claimed_by, claimed_at, confirmed) VALUES (?, ?, ?, 0) "
+                "ON CONFLICT(id) DO UPDATE SET claimed_by = excluded.claimed_by, claimed_at = excluded.claimed_at "
+                "WHERE sent_grants.confirmed = 0 AND sent_grants.claimed_at < ?",
+                (gid, WORKER_ID, now, now - CLAIM_TTL),
+            )
+            if cur.rowcount:
+                claimed.add(gid)
+    return claimed
+
+def confirm_claims(ids: Iterable[str]):
+    """Помечает захваченные гранты отправленными."""
+    try:
+        with closing(connect()) as conn, conn:
+            conn.executemany(
+                "UPDATE sent_grants SET confirmed = 1 WHERE id = ? AND claimed_by = ?",
+                [(gid, WORKER_ID) for gid in ids],
+            )
+    except Exception as e:
+        # Гранты уже в канале; в худшем случае они уйдут повторно после CLAIM_TTL
+        logger.error(f"Ошибка подтверждения грантов: {e}")
+
+def release_claims(ids: Iterable[str]):
+    """Возвращает гранты в очередь (например, если отправка не удалась)."""
+    try:
+        with closing(connect()) as conn, conn:
+            conn.executemany(
+                "DELETE FROM sent_grants WHERE id = ? AND claimed_by = ? AND confirmed = 0",
+                [(gid, WORKER_ID) for gid in ids],
+            )
+    except Exception as e:
+        logger.error(f"Ошибка освобождения грантов: {e}")
+
+def clear_claims() -> int:
+    with closing(connect()) as conn, conn:
+        return conn.execute("DELETE FROM sent_grants").rowcount
+
+def import_sent_file(path: str):
+    """Переносит историю из старого sent_grants.json в общую таблицу."""
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            hashes: List[str] = json.load(f)
+        with closing(connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO sent_grants (id, claimed_by, claimed_at) VALUES (?, ?, ?)",
+                [(h, "legacy", 0.0) for h in hashes],
+            )
+        os.replace(path, path + ".imported")
+        logger.info(f"История перенесена в базу: {len(hashes)} записей")
+    except Exception as e:
+        logger.error(f"Ошибка переноса истории: {e}")
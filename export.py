@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Выгрузка архива грантов в JSONL/CSV
+- Записи читаются курсором SQLite построчно, память не зависит от объёма
+- Фильтры по дате публикации, источнику, направлению и сумме; опционально gzip
+"""
+import csv
+import gzip
+import json
+import logging
+from contextlib import closing
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional
+
+from archive import connect as connect_archive
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv")
+
+CSV_FIELDS = [
+    "id", "posted_at", "title", "organizer", "source", "direction",
+    "annual_amount_min", "amount", "deadline_info", "deadline",
+    "project_duration", "details_url", "description",
+]
+
+
+def parse_date(value: Optional[str], end_of_day: bool = False) -> Optional[float]:
+    """'ГГГГ-ММ-ДД' или 'ДД.ММ.ГГГГ' → timestamp (для until — конец дня)."""
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y"):
+        try:
+            day = datetime.strptime(value, fmt)
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError(f"Неверная дата: {value}")
+    return (day + timedelta(days=1) if end_of_day else day).timestamp()
+
+def _iso(ts: Optional[float]) -> str:
+    return datetime.fromtimestamp(ts).isoformat(timespec="seconds") if ts else ""
+
+# ─── Чтение ───────────────────────────────────────────────────────────────────
+
+def iter_grants(since: str = None, until: str = None, source: str = None,
+                direction: str = None, min_amount: int = None, max_amount: int = None) -> Iterator[Dict]:
+    where, params = [], []
+    for clause, value in (
+        ("posted_at >= ?", parse_date(since)),
+        ("posted_at < ?", parse_date(until, end_of_day=True)),
+        ("source = ?", source),
+        ("direction = ?", direction),
+        ("annual_amount_min >= ?", min_amount),
+        ("annual_amount_min <= ?", max_amount),
+    ):
+        if value is not None:
+            where.append(clause)
+            params.append(value)
+    sql = "SELECT data, source, posted_at, deadline_ts FROM grants"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY posted_at"
+
+    with closing(connect_archive()) as conn:
+        cursor = conn.execute(sql, params)
+        cursor.arraysize = 1000
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                return
+            for row in rows:
+                g = json.loads(row["data"])
+                # Колонка source заполнена и для статических грантов (по организатору), как в фильтре
+                g["source"] = row["source"] or ""
+                g["posted_at"] = _iso(row["posted_at"])
+                g["deadline"] = _iso(row["deadline_ts"])
+                g.pop("deadline_ts", None)
+                yield g
+
+# ─── Запись ───────────────────────────────────────────────────────────────────
+
+def export_grants(path: str, fmt: str = "jsonl", compress: bool = False, **filters) -> int:
+    """Пишет выгрузку в path и возвращает число записей."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    opener = gzip.open if compress else open
+    count = 0
+    with opener(path, "wt", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for g in iter_grants(**filters):
+                writer.writerow(g)
+                count += 1
+        else:
+            for g in iter_grants(**filters):
+                f.write(json.dumps(g, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    logger.info(f"Выгружено грантов: {count} → {path}")
+    return count
+
+def default_export_name(fmt: str, compress: bool) -> str:
+    name = f"grants_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return name + ".gz" if compress else name
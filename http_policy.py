@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Политика HTTP-запросов к источникам
+- Раздельные таймауты соединения и чтения
+- Повторы идемпотентных GET с экспоненциальной задержкой и джиттером
+- Хеджирование: второй запрос, если первый не ответил за p90 латентности источника
+- Пул соединений и кэш DNS на хост
+"""
+import time
+import random
+import socket
+import logging
+import threading
+import ipaddress
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Deque, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from archive import connect as connect_archive
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+LATENCY_WINDOW = 50
+HEDGE_MIN_SAMPLES = 5
+HEDGE_MIN_DELAY = 0.2
+DNS_CACHE_TTL = 300
+DNS_CACHE_SIZE = 256
+
+# ─── Кэш DNS ──────────────────────────────────────────────────────────────────
+# Кэш подключается только к сессиям лент через свой HTTPAdapter; остальной
+# процесс (клиент Telegram и т.п.) резолвит имена как обычно.
+
+class DNSCache:
+    """Все адреса хостов с TTL; при переполнении сначала вытесняются протухшие записи."""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL, max_size: int = DNS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get((host, port))
+        if hit and hit[0] > now:
+            return list(hit[1])
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                while len(self._entries) >= self.max_size:
+                    self._entries.pop(next(iter(self._entries)))
+            self._entries[(host, port)] = (now + self.ttl, addresses)
+        return list(addresses)
+
+    def prefer(self, host: str, port: int, address: str):
+        """Ставит адрес, к которому удалось подключиться, первым в списке."""
+        with self._lock:
+            hit = self._entries.get((host, port))
+            if hit and hit[1][0] != address and address in hit[1]:
+                self._entries[(host, port)] = (hit[0], [address] + [a for a in hit[1] if a != address])
+
+    def forget(self, host: str, port: int):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+FEED_DNS = DNSCache()
+
+class _CachedDNSMixin:
+    """Подключается к адресам из FEED_DNS по очереди, как create_connection
+    перебирает ответ getaddrinfo (например, AAAA без IPv6-маршрута, затем A).
+    Host и SNI остаются исходным именем.
+    """
+
+    def _new_conn(self):
+        host, port = self._dns_host, self.port
+        name = host.rstrip(".")
+        try:
+            addresses = FEED_DNS.resolve(name, port)
+        except OSError:
+            # Ошибку резолва urllib3 обернёт сам, и её подхватят повторы политики
+            return super()._new_conn()
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    conn = super()._new_conn()
+                except Exception as e:
+                    error = e
+                    continue
+                FEED_DNS.prefer(name, port, address)
+                return conn
+        finally:
+            self._dns_host = host
+        # Ни один адрес не ответил — в следующий раз имя резолвится заново
+        FEED_DNS.forget(name, port)
+        raise error
+
+class CachedDNSHTTPConnection(_CachedDNSMixin, HTTPConnection):
+    pass
+
+class CachedDNSHTTPSConnection(_CachedDNSMixin, HTTPSConnection):
+    pass
+
+class CachedDNSHTTPPool(HTTPConnectionPool):
+    ConnectionCls = CachedDNSHTTPConnection
+
+class CachedDNSHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = CachedDNSHTTPSConnection
+
+class CachedDNSAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": CachedDNSHTTPPool, "https": CachedDNSHTTPSPool}
+
+# ─── Латентность источников ───────────────────────────────────────────────────
+# Окно хранится в grants.db: парсер из cron делает один запрос к ленте за запуск,
+# и без сохранения хеджирование никогда бы не включилось.
+
+LATENCY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feed_latency (
+    url     TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feed_latency_url ON feed_latency(url);
+"""
+
+def _connect():
+    conn = connect_archive()
+    conn.executescript(LATENCY_SCHEMA)
+    return conn
+
+def load_latency(url: str) -> List[float]:
+    try:
+        with closing(_connect()) as conn:
+            rows = conn.execute(
+                "SELECT seconds FROM feed_latency WHERE url = ? ORDER BY rowid DESC LIMIT ?",
+                (url, LATENCY_WINDOW),
+            ).fetchall()
+        return [r[0] for r in reversed(rows)]
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать латентность {url}: {e}")
+        return []
+
+def store_latency(url: str, seconds: float):
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute("INSERT INTO feed_latency (url, seconds) VALUES (?, ?)", (url, seconds))
+            conn.execute(
+                "DELETE FROM feed_latency WHERE url = ? AND rowid NOT IN "
+                "(SELECT rowid FROM feed_latency WHERE url = ? ORDER BY rowid DESC LIMIT ?)",
+                (url, url, LATENCY_WINDOW),
+            )
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить латентность {url}: {e}")
+
+# ─── Политика ─────────────────────────────────────────────────────────────────
+
+class RequestPolicy:
+    def __init__(self, connect_timeout: float = 5, read_timeout: float = 15,
+                 retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8,
+                 hedge: bool = True, pool_size: int = 4):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._latency: Dict[str, Deque[float]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="http")
+
+    def session(self, url: str) -> requests.Session:
+        host = urlsplit(url).netloc
+        with self._lock:
+            s = self._sessions.get(host)
+            if s is None:
+                s = requests.Session()
+                adapter = CachedDNSAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                self._sessions[host] = s
+            return s
+
+    def _window(self, url: str) -> Deque[float]:
+        with self._lock:
+            window = self._latency.get(url)
+        if window is None:
+            window = deque(load_latency(url), maxlen=LATENCY_WINDOW)
+            with self._lock:
+                window = self._latency.setdefault(url, window)
+        return window
+
+    def p90(self, url: str) -> Optional[float]:
+        window = self._window(url)
+        with self._lock:
+            samples = sorted(window)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, samples[int(0.9 * (len(samples) - 1))])
+
+    def _record(self, url: str, elapsed: float):
+        window = self._window(url)
+        with self._lock:
+            window.append(elapsed)
+        store_latency(url, elapsed)
+
+    def _timed_get(self, url: str, **kwargs) -> requests.Response:
+        started = time.monotonic()
+        resp = self.session(url).get(url, timeout=self.timeout, **kwargs)
+        self._record(url, time.monotonic() - started)
+        return resp
+
+    def _hedged_get(self, url: str, **kwargs) -> requests.Response:
+        delay = self.p90(url) if self.hedge else None
+        if delay is None:
+            # Хедж не взведён — запрос в текущем потоке, виден профилировщику этапа
+            return self._timed_get(url, **kwargs)
+        first = self._executor.submit(self._timed_get, url, **kwargs)
+        if wait([first], timeout=delay).done:
+            return first.result()
+
+        logger.info(f"  {url}: нет ответа за p90={delay:.2f}с, отправляю хедж-запрос")
+        pending = {first, self._executor.submit(self._timed_get, url, **kwargs)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    # Проигравший запрос дорабатывает в фоне, его соединение вернётся в пул
+                    for loser in pending:
+                        loser.add_done_callback(lambda l: l.exception() is None and l.result().close())
+                    return f.result()
+                error = f.exception()
+        raise error
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Идемпотентный GET с повторами; последний ответ или ошибка отдаются вызывающему."""
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                resp = self._hedged_get(url, **kwargs)
+                if resp.status_code not in RETRY_STATUSES or last:
+                    return resp
+                reason = f"HTTP {resp.status_code}"
+                resp.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if last:
+                    raise
+                reason = type(e).__name__
+            pause = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            logger.info(f"  {url}: {reason}, повтор {attempt + 1}/{self.retries} через {pause:.1f}с")
+            time.sleep(pause)
@@ -11,25 +11,32 @@ import json
 import time
 import hashlib
 import logging
+import tempfile
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 import requests
 
+from archive import archive_grants
+from catalogue import StaticCatalogue
+from profiling import RunProfiler
+from report import save_html_report
+from http_policy import RequestPolicy
+from coordination import leased, claim_grants, confirm_claims, release_claims, import_sent_file
+
 logger = logging.getLogger(__name__)
 
 SCRIPT_DIR       = os.path.dirname(os.path.abspath(__file__))
 SENT_GRANTS_FILE = os.path.join(SCRIPT_DIR, "sent_grants.json")
 SETTINGS_FILE    = os.path.join(SCRIPT_DIR, "settings.json")
-HTML_REPORT_FILE = os.path.join(SCRIPT_DIR, "grants_report.html")
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 
 # ─── Настройки ────────────────────────────────────────────────────────────────
 
 def load_settings() -> dict:
-    defaults = {"min_amount": 5_000_000, "min_days": 14}
+    defaults = {"min_amount": 5_000_000, "min_days": 14, "remind_days": [7, 3, 1]}
     try:
         if os.path.exists(SETTINGS_FILE):
             with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
@@ -40,211 +47,14 @@ def load_settings() -> dict:
 
 def save_settings(settings: dict):
     try:
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(settings, f, ensure_ascii=False, indent=2)
+        write_atomic(SETTINGS_FILE, json.dumps(settings, ensure_ascii=False, indent=2))
     except Exception as e:
         logger.error(f"Ошибка сохранения настроек: {e}")
 
 # ─── Статические гранты из Стратегии МГТУ 2030 ───────────────────────────────
 
-STATIC_GRANTS = [
-    {
-        "title": "Электромеханические беспилотные автомобили большой грузоподъёмности",
-        "organizer": "Минобрнауки России",
-        "amount": "от 15 млн руб./год",
-        "annual_amount_min": 15_000_000,
-        "description": "Разработка отечественных научных приборов для добывающих отраслей промышленности РФ",
-        "direction": "Транспортные системы",
-        "details_url": "https://minobrnauki.gov.ru/ru/activity/grant/competitions/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "2-3 года",
-        "special_requirements": "Наличие научного задела, соответствие нацпроекту 'Наука'",
-        "eligible_participants": "Университеты и научные организации РФ",
-    },
-    {
-        "title": "Сверхпроизводительные вычисления и аналитика больших данных",
-        "organizer": "Минобрнауки России, РФТР",
-        "amount": "20-50 млн руб./год",
-        "annual_amount_min": 20_000_000,
-        "description": "Создание отечественной продуктовой линейки гибридных сопроцессоров нового поколения",
-        "direction": "Суперкомпьютерные технологии",
-        "details_url": "https://minobrnauki.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30-45 дней",
-        "project_duration": "3 года",
-        "special_requirements": "Соответствие приоритетным направлениям НТР",
-        "eligible_participants": "Ведущие технические университеты",
-    },
-    {
-        "title": "Персонализированная медицина и здоровьесбережение",
-        "organizer": "Минздрав, Минобрнауки",
-        "amount": "10-30 млн руб./год",
-        "annual_amount_min": 10_000_000,
-        "description": "Разработка индивидуальных подходов к диагностике и лечению заболеваний",
-        "direction": "Биомедицинские технологии",
-        "details_url": "https://minzdrav.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "3 года",
-        "special_requirements": "Наличие медицинских партнёров",
-        "eligible_participants": "Университеты с биомедицинскими направлениями",
-    },
-    {
-        "title": "Биомедицинские исследования (Биомедстарт)",
-        "organizer": "Минздрав, Минобрнауки",
-        "amount": "15-30 млн руб./год",
-        "annual_amount_min": 15_000_000,
-        "description": "Исследования в области биомедицины и биотехнологий",
-        "direction": "Биомедицинские технологии",
-        "details_url": "https://minobrnauki.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "3 года",
-        "special_requirements": "Научная новизна, практическая значимость",
-        "eligible_participants": "Университеты и НИИ",
-    },
-    {
-        "title": "Химические технологии и лабораторные исследования",
-        "organizer": "Минобрнауки, Минпромторг",
-        "amount": "10-25 млн руб./год",
-        "annual_amount_min": 10_000_000,
-        "description": "Разработка новых химических технологий и материалов",
-        "direction": "Химические технологии",
-        "details_url": "https://minpromtorg.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "2-3 года",
-        "special_requirements": "Лабораторная база",
-        "eligible_participants": "Университеты с химическими факультетами",
-    },
-    {
-        "title": "Материалы и нанотехнологии (МНОКстарт)",
-        "organizer": "Минобрнауки, РФФИ",
-        "amount": "15-30 млн руб./год",
-        "annual_amount_min": 15_000_000,
-        "description": "Исследования и разработка новых материалов и нанотехнологий",
-        "direction": "Новые материалы",
-        "details_url": "https://minobrnauki.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "3 года",
-        "special_requirements": "Оборудование для нанотехнологий",
-        "eligible_participants": "Исследовательские университеты",
-    },
-    {
-        "title": "Машиностроительные технологии и перспективные материалы",
-        "organizer": "Минпромторг, Минобрнауки",
-        "amount": "15-35 млн руб./год",
-        "annual_amount_min": 15_000_000,
-        "description": "Разработка новых материалов и технологий для машиностроения",
-        "direction": "Машиностроение",
-        "details_url": "https://minpromtorg.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "3 года",
-        "special_requirements": "Промышленные партнёры",
-        "eligible_participants": "Технические университеты",
-    },
-    {
-        "title": "Космическая техника и системы",
-        "organizer": "Роскосмос, Минобрнауки",
-        "amount": "25-60 млн руб./год",
-        "annual_amount_min": 25_000_000,
-        "description": "Разработка компонентов и систем для космической отрасли",
-        "direction": "Космические технологии",
-        "details_url": "https://www.roscosmos.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "3-5 лет",
-        "special_requirements": "Допуск к космическим технологиям",
-        "eligible_participants": "Аккредитованные организации",
-    },
-    {
-        "title": "Оборонные технологии и системы",
-        "organizer": "Минобороны, Ростех",
-        "amount": "30-100 млн руб./год",
-        "annual_amount_min": 30_000_000,
-        "description": "Разработка технологий для оборонно-промышленного комплекса",
-        "direction": "Оборонные технологии",
-        "details_url": "https://minoborony.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "3-5 лет",
-        "special_requirements": "Форма допуска, лицензия ФСБ",
-        "eligible_participants": "Организации с лицензией ФСБ",
-    },
-    {
-        "title": "Цифровые платформы и ИИ-сервисы",
-        "organizer": "Минцифры, Минобрнауки",
-        "amount": "15-40 млн руб./год",
-        "annual_amount_min": 15_000_000,
-        "description": "Разработка цифровых платформ и сервисов на основе искусственного интеллекта",
-        "direction": "Цифровые технологии",
-        "details_url": "https://digital.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "2-3 года",
-        "special_requirements": "Команда разработчиков",
-        "eligible_participants": "IT-центры университетов",
-    },
-    {
-        "title": "Технологии энергомашиностроения",
-        "organizer": "Минэнерго, Минобрнауки",
-        "amount": "20-45 млн руб./год",
-        "annual_amount_min": 20_000_000,
-        "description": "Разработка оборудования и технологий для энергетического машиностроения",
-        "direction": "Энергетическое машиностроение",
-        "details_url": "https://minenergo.gov.ru/",
-        "rating": 4,
-        "deadline_info": "30+ дней",
-        "project_duration": "3 года",
-        "special_requirements": "Партнёрство с энергокомпаниями",
-        "eligible_participants": "Энергетические институты",
-    },
-    {
-        "title": "Интеллектуальные производственные и транспортные системы",
-        "organizer": "Минобрнауки, Фонд развития промышленности",
-        "amount": "15-40 млн руб./год",
-        "annual_amount_min": 15_000_000,
-        "description": "Разработка систем автоматизации и роботизации производственных процессов",
-        "direction": "Индустрия 4.0",
-        "details_url": "https://minobrnauki.gov.ru/",
-        "rating": 4,
-        "deadline_info": "21-30 дней",
-        "project_duration": "3 года",
-        "special_requirements": "Промышленный партнёр",
-        "eligible_participants": "Технические университеты",
-    },
-    {
-        "title": "Новые технологии транспорта и связи",
-        "organizer": "Минтранс, Минцифры",
-        "amount": "10-25 млн руб./год",
-        "annual_amount_min": 10_000_000,
-        "description": "Разработка инновационных технологий в области транспорта и связи",
-        "direction": "Транспорт и связь",
-        "details_url": "https://mintrans.gov.ru/",
-        "rating": 3,
-        "deadline_info": "30+ дней",
-        "project_duration": "2-3 года",
-        "special_requirements": "Отраслевые партнёры",
-        "eligible_participants": "Университеты транспортного профиля",
-    },
-    {
-        "title": "Венчурное финансирование НИОКР",
-        "organizer": "Уполномоченные банки, эндаумент-фонды",
-        "amount": "от 15 млн руб./год",
-        "annual_amount_min": 15_000_000,
-        "description": "Механизм проектного финансирования инженерных разработок",
-        "direction": "Инновационное предпринимательство",
-        "details_url": "https://www.rvc.ru/",
-        "rating": 4,
-        "deadline_info": "Индивидуально",
-        "project_duration": "2-5 лет",
-        "special_requirements": "Бизнес-модель, коммерческий потенциал",
-        "eligible_participants": "Стартапы и spin-off компании",
-    },
-]
+STATIC_GRANTS_FILE = os.getenv("STATIC_GRANTS_FILE", os.path.join(SCRIPT_DIR, "static_grants.json"))
+STATIC_CATALOGUE   = StaticCatalogue(STATIC_GRANTS_FILE)
 
 # ─── RSS источники ─────────────────────────────────────────────────────────────
 
@@ -264,6 +74,9 @@ HEADERS = {
     )
 }
 
+# Ленты госсайтов бывают медленными: повторы, хеджирование по p90, пул и кэш DNS
+FEED_POLICY = RequestPolicy(connect_timeout=5, read_timeout=15, retries=3)
+
 GRANT_KEYWORDS = [
     "грант", "конкурс", "финансирован", "субсидия",
     "заявк", "отбор", "научный проект", "нир ", "ниокр",
@@ -271,21 +84,16 @@ GRANT_KEYWORDS = [
 
 # ─── Утилиты ──────────────────────────────────────────────────────────────────
 
-def load_sent_grants() -> set:
-    try:
-        if os.path.exists(SENT_GRANTS_FILE):
-            with open(SENT_GRANTS_FILE, "r", encoding="utf-8") as f:
-                return set(json.load(f))
-    except Exception:
-        pass
-    return set()
-
-def save_sent_grants(sent: set):
+def write_atomic(path: str, text: str):
+    # Читатели из других процессов видят либо старый, либо новый файл целиком
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp")
     try:
-        with open(SENT_GRANTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(list(sent), f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Ошибка сохранения истории: {e}")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
 
 def grant_hash(title: str, source: str = "") -> str:
     return hashlib.md5(f"{title.strip().lower()}|{source}".encode()).hexdigest()
@@ -304,12 +112,58 @@ def extract_amount(text: str) -> Optional[int]:
                 continue
     return None
 
+MONTHS = {
+    "января": 1, "январь": 1, "февраля": 2, "февраль": 2, "марта": 3, "март": 3,
+    "апреля": 4, "апрель": 4, "мая": 5, "май": 5, "июня": 6, "июнь": 6,
+    "июля": 7, "июль": 7, "августа": 8, "август": 8, "сентября": 9, "сентябрь": 9,
+    "октября": 10, "октябрь": 10, "ноября": 11, "ноябрь": 11, "декабря": 12, "декабрь": 12,
+}
+
+def parse_deadline(text: str, base: datetime = None, deadline_field: bool = False) -> Optional[float]:
+    """Переводит срок подачи («до 15.03.2026», «до 1 марта») в timestamp.
+
+    В свободном тексте (deadline_field=False) признаются только даты после «до»;
+    голые даты — только в самом поле срока подачи. Примерные сроки («30+ дней»,
+    «21-30 дней») датой не являются: None, напоминание не планируется.
+    """
+    if not text:
+        return None
+    base = base or datetime.now()
+    t = text.lower()
+    prefix = r"(?:до\s+)?" if deadline_field else r"до\s+"
+
+    m = re.search(prefix + r"(\d{1,2})\.(\d{1,2})\.(\d{4})", t)
+    if m:
+        try:
+            return datetime(int(m[3]), int(m[2]), int(m[1]), 23, 59).timestamp()
+        except ValueError:
+            pass
+
+    m = re.search(prefix + r"(\d{1,2})\s+([а-я]+)(?:\s+(\d{4}))?", t)
+    month = MONTHS.get(m[2]) if m else None
+    if month:
+        year = int(m[3]) if m[3] else base.year
+        try:
+            deadline = datetime(year, month, int(m[1]), 23, 59)
+            if not m[3] and deadline < base:
+                deadline = deadline.replace(year=year + 1)
+            return deadline.timestamp()
+        except ValueError:
+            pass
+    return None
+
+def grant_deadline(g: dict, base: datetime = None) -> Optional[float]:
+    # У RSS в deadline_info лежит дата публикации, срок ищем в тексте новости
+    if g.get("type") == "rss":
+        return parse_deadline(f"{g['title']} {g.get('description', '')}", base)
+    return parse_deadline(g.get("deadline_info", ""), base, deadline_field=True)
+
 # ─── Парсинг RSS ──────────────────────────────────────────────────────────────
 
 def fetch_rss(source: dict) -> List[Dict]:
     items = []
     try:
-        resp = requests.get(source["url"], headers=HEADERS, timeout=15)
+        resp = FEED_POLICY.get(source["url"], headers=HEADERS)
         resp.raise_for_status()
         root = ET.fromstring(resp.content)
         ns = {"atom": "http://www.w3.org/2005/Atom"}
@@ -416,61 +270,17 @@ def format_message(grants: List[Dict], settings: dict) -> str:
         body += "━" * 22 + "\n\n"
     return header + body + "🤖 <i>Автоматический мониторинг грантов МГТУ</i>"
 
-# ─── HTML отчёт ───────────────────────────────────────────────────────────────
+# ─── Главная функция ──────────────────────────────────────────────────────────
 
-def save_html_report(grants: List[Dict]):
+def run_parser(settings: dict = None, channel_id: str = None, profiler: RunProfiler = None) -> int:
+    # Профилирование: GRANTS_PROFILE=1, флаг --profile или команда бота /profile
+    profiler = profiler or RunProfiler()
     try:
-        rows = ""
-        for i, g in enumerate(grants, 1):
-            stars = "⭐" * g.get("rating", 3)
-            rows += f"""
-            <tr>
-                <td>{i}</td>
-                <td><b>{g['title']}</b><br><small>{g.get('description','')[:150]}</small></td>
-                <td>{g['organizer']}</td>
-                <td style="color:green;font-weight:bold">{g['amount']}</td>
-                <td>{g['direction']}</td>
-                <td>{g.get('deadline_info','')}</td>
-                <td>{g.get('project_duration','')}</td>
-                <td>{stars}</td>
-                <td><a href="{g.get('details_url','#')}" target="_blank">Открыть</a></td>
-            </tr>"""
-
-        html = f"""<!DOCTYPE html>
-<html lang="ru">
-<head>
-<meta charset="UTF-8">
-<title>Гранты МГТУ — {datetime.now().strftime('%d.%m.%Y')}</title>
-<style>
-  body{{font-family:Arial,sans-serif;padding:20px;background:#f5f5f5}}
-  h1{{background:linear-gradient(135deg,#667eea,#764ba2);color:white;padding:20px;border-radius:8px}}
-  table{{width:100%;border-collapse:collapse;background:white;border-radius:8px;overflow:hidden;box-shadow:0 2px 8px rgba(0,0,0,0.1)}}
-  th{{background:#667eea;color:white;padding:12px;text-align:left}}
-  td{{padding:10px;border-bottom:1px solid #eee;vertical-align:top}}
-  tr:hover{{background:#f9f9ff}}
-  a{{color:#667eea}}
-</style>
-</head>
-<body>
-<h1>🎯 Гранты для МГТУ им. Баумана</h1>
-<p>📅 {datetime.now().strftime('%d.%m.%Y %H:%M')} | Найдено грантов: <b>{len(grants)}</b></p>
-<table>
-<tr><th>#</th><th>Название</th><th>Организатор</th><th>Финансирование</th>
-<th>Направление</th><th>Срок подачи</th><th>Реализация</th><th>Рейтинг</th><th>Ссылка</th></tr>
-{rows}
-</table>
-<p><i>🤖 Автоматический мониторинг грантов МГТУ</i></p>
-</body></html>"""
-
-        with open(HTML_REPORT_FILE, "w", encoding="utf-8") as f:
-            f.write(html)
-        logger.info(f"HTML отчёт сохранён: {HTML_REPORT_FILE}")
-    except Exception as e:
-        logger.error(f"Ошибка HTML отчёта: {e}")
+        return _run_parser(settings, channel_id, profiler)
+    finally:
+        profiler.finish()
 
-# ─── Главная функция ──────────────────────────────────────────────────────────
-
-def run_parser(settings: dict = None, channel_id: str = None) -> int:
+def _run_parser(settings: Optional[dict], channel_id: Optional[str], profiler: RunProfiler) -> int:
     if settings is None:
         settings = load_settings()
 
@@ -481,13 +291,18 @@ def run_parser(settings: dict = None, channel_id: str = None) -> int:
     logger.info(f"Порог суммы: {min_amount:,} руб/год")
 
     # 1. Статические гранты
-    all_grants = [g for g in STATIC_GRANTS if g["annual_amount_min"] >= min_amount]
+    with profiler.stage("static_filter"):
+        all_grants = STATIC_CATALOGUE.filter(min_amount)
     logger.info(f"Статических грантов: {len(all_grants)}")
 
     # 2. RSS (если доступны)
     rss_count = 0
     for source in RSS_SOURCES:
-        items = fetch_rss(source)
+        # Источник, который сейчас читает другой воркер, пропускаем
+        with leased(f"source:{source['name']}") as ok, profiler.stage(f"fetch_rss:{source['name']}"):
+            items = fetch_rss(source) if ok else []
+        if not ok:
+            logger.info(f"  {source['name']}: обрабатывается другим воркером")
         for item in items:
             if item["annual_amount_min"] == 0 or item["annual_amount_min"] >= min_amount:
                 all_grants.append(item)
@@ -495,29 +310,51 @@ def run_parser(settings: dict = None, channel_id: str = None) -> int:
     logger.info(f"Из RSS: {rss_count}")
 
     # 3. Фильтр новых
-    sent = load_sent_grants()
-    new_grants = []
-    for g in all_grants:
-        h = grant_hash(g["title"], g.get("source", g.get("organizer", "")))
-        if h not in sent:
-            new_grants.append(g)
-            sent.add(h)
+    with profiler.stage("dedup"):
+        import_sent_file(SENT_GRANTS_FILE)
+        candidates = [
+            {**g, "id": grant_hash(g["title"], g.get("source", g.get("organizer", "")))}
+            for g in all_grants
+        ]
+        claimed = claim_grants(g["id"] for g in candidates)
+        new_grants = []
+        for g in candidates:
+            if g["id"] in claimed:
+                new_grants.append(g)
+                claimed.discard(g["id"])
 
     logger.info(f"Новых грантов: {len(new_grants)}")
 
     if not new_grants:
         return 0
 
-    # 4. Сортировка по рейтингу
-    new_grants.sort(key=lambda x: (x.get("rating", 0), x.get("annual_amount_min", 0)), reverse=True)
-
-    # 5. Отправка в Telegram
-    msg = format_message(new_grants, settings)
-    success = send_telegram(msg, target)
+    success = False
+    try:
+        # 4. Сортировка по рейтингу
+        with profiler.stage("sort"):
+            new_grants.sort(key=lambda x: (x.get("rating", 0), x.get("annual_amount_min", 0)), reverse=True)
+
+        # 5. Отправка в Telegram
+        with profiler.stage("format"):
+            msg = format_message(new_grants, settings)
+        with profiler.stage("send"):
+            success = send_telegram(msg, target)
+    finally:
+        if success:
+            confirm_claims(g["id"] for g in new_grants)
+        else:
+            # Захваченные, но не отправленные гранты уйдут в следующий запуск;
+            # если процесс упал раньше, их заберут по истечении CLAIM_TTL
+            release_claims(g["id"] for g in new_grants)
 
     if success:
-        save_sent_grants(sent)
-        save_html_report(new_grants)
+        with profiler.stage("archive"):
+            now = datetime.now()
+            for g in new_grants:
+                g["deadline_ts"] = grant_deadline(g, now)
+            archive_grants(new_grants, settings.get("remind_days", [7, 3, 1]), now.timestamp())
+        with profiler.stage("html_report"):
+            save_html_report(new_grants)
         logger.info(f"✅ Отправлено {len(new_grants)} грантов")
         return len(new_grants)
     else:
@@ -526,6 +363,39 @@ def run_parser(settings: dict = None, channel_id: str = None) -> int:
 
 
 if __name__ == "__main__":
+    import argparse
+    from export import FORMATS, export_grants, default_export_name
+
+    ap = argparse.ArgumentParser(description="Парсер грантов для МГТУ им. Баумана")
+    ap.add_argument("--profile", action="store_true",
+                    help="профилировать этапы (cProfile + tracemalloc), результат в profiles/")
+    sub = ap.add_subparsers(dest="command")
+
+    ex = sub.add_parser("export", help="выгрузить архив грантов в JSONL/CSV")
+    ex.add_argument("-o", "--output", help="файл выгрузки (по умолчанию grants_export_<дата>.<формат>)")
+    ex.add_argument("-f", "--format", choices=FORMATS, default="jsonl")
+    ex.add_argument("--gzip", action="store_true", help="сжать gzip")
+    ex.add_argument("--since", help="опубликованы с даты (ГГГГ-ММ-ДД)")
+    ex.add_argument("--until", help="опубликованы по дату включительно (ГГГГ-ММ-ДД)")
+    ex.add_argument("--source", help="источник, например 'РНФ'")
+    ex.add_argument("--direction", help="направление, например 'Новые материалы'")
+    ex.add_argument("--min-amount", type=int)
+    ex.add_argument("--max-amount", type=int)
+    args = ap.parse_args()
+
     logging.basicConfig(level=logging.INFO)
-    count = run_parser()
-    print(f"Готово. Отправлено: {count}")
+
+    if args.command == "export":
+        output = args.output or default_export_name(args.format, args.gzip)
+        count = export_grants(
+            output, args.format, args.gzip,
+            since=args.since, until=args.until, source=args.source, direction=args.direction,
+            min_amount=args.min_amount, max_amount=args.max_amount,
+        )
+        print(f"Готово. Выгружено: {count} → {output}")
+    else:
+        profiler = RunProfiler(enabled=True) if args.profile else None
+        count = run_parser(profiler=profiler)
+        print(f"Готово. Отправлено: {count}")
+        if profiler and profiler.summary_file:
+            print(f"Профиль: {profiler.run_dir}")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Профилирование запусков парсера
+- cProfile и tracemalloc на каждый этап run_parser
+- Для каждого запуска: .prof (pstats), .folded (для flamegraph.pl / speedscope)
+  и summary.txt с топом аллокаций
+"""
+import os
+import re
+import time
+import threading
+import cProfile
+import pstats
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR   = os.path.dirname(os.path.abspath(__file__))
+PROFILES_DIR = os.getenv("GRANTS_PROFILE_DIR", os.path.join(SCRIPT_DIR, "profiles"))
+PROFILE_ENV  = "GRANTS_PROFILE"
+TOP_N        = 15
+
+MAX_STACK_DEPTH     = 64
+MIN_STACK_US        = 100
+MAX_PATHS_PER_FUNC  = 64
+
+# tracemalloc общий на процесс: останавливаем его, когда завершился последний профиль
+_tracemalloc_lock  = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_ours  = False
+
+
+def profiling_enabled() -> bool:
+    return os.getenv(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+# ─── Свёрнутые стеки ──────────────────────────────────────────────────────────
+
+def _label(func: tuple) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+
+def folded_stacks(stats: pstats.Stats) -> Dict[str, int]:
+    """Строит свёрнутые стеки («a;b;c мкс») из графа вызовов cProfile.
+
+    cProfile хранит только рёбра вызывающий → вызываемый, поэтому собственное
+    время функции распределяется по вызывающим пропорционально cumtime ребра.
+    Ветви короче MIN_STACK_US и сверх MAX_PATHS_PER_FUNC на функцию не
+    раскрываются — их время остаётся на уже пройденной части стека.
+    """
+    raw = stats.stats
+    folded: Dict[str, int] = {}
+
+    def emit(stack: List[str], weight: float):
+        key = ";".join(reversed(stack))
+        folded[key] = folded.get(key, 0) + int(weight * 1_000_000)
+
+    def walk(func, weight: float, stack: List[str], seen: frozenset, budget: List[int]):
+        callers = {c: edge for c, edge in raw[func][4].items() if c in raw and c not in seen}
+        total = sum(edge[3] for edge in callers.values())
+        if not callers or total <= 0 or len(stack) >= MAX_STACK_DEPTH:
+            budget[0] -= 1
+            emit(stack, weight)
+            return
+        rest = 0.0
+        for caller, edge in sorted(callers.items(), key=lambda c: -c[1][3]):
+            part = weight * edge[3] / total
+            if part * 1_000_000 >= MIN_STACK_US and budget[0] > 0:
+                walk(caller, part, stack + [_label(caller)], seen | {caller}, budget)
+            else:
+                rest += part
+        if rest:
+            emit(stack, rest)
+
+    for func, (_, _, tottime, _, _) in raw.items():
+        if tottime * 1_000_000 >= MIN_STACK_US:
+            walk(func, tottime, [_label(func)], frozenset([func]), [MAX_PATHS_PER_FUNC])
+    return {k: v for k, v in folded.items() if v > 0}
+
+
+def _acquire_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_ours
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_ours = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_ours
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_ours:
+            tracemalloc.stop()
+            _tracemalloc_ours = False
+
+
+# ─── Профилировщик запуска ────────────────────────────────────────────────────
+
+class RunProfiler:
+    """Оборачивает этапы run_parser; при enabled=False ничего не делает."""
+
+    def __init__(self, enabled: bool = None, out_dir: str = PROFILES_DIR, top_n: int = TOP_N):
+        self.enabled = profiling_enabled() if enabled is None else enabled
+        self.out_dir = out_dir
+        self.top_n = top_n
+        self.run_dir: Optional[str] = None
+        self.summary_file: Optional[str] = None
+        self._stages: List[Dict] = []
+        self._tracing = False
+
+    def _start(self):
+        self.run_dir = os.path.join(self.out_dir, datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+        os.makedirs(self.run_dir, exist_ok=True)
+        _acquire_tracemalloc()
+        self._tracing = True
+        logger.info(f"Профилирование включено: {self.run_dir}")
+
+    @contextmanager
+    def stage(self, name: str):
+        """Профилирует блок. Любая ошибка профилировщика логируется и не прерывает запуск."""
+        if not self.enabled:
+            yield
+            return
+        try:
+            if self.run_dir is None:
+                self._start()
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            before = tracemalloc.take_snapshot().filter_traces(ignore)
+            tracemalloc.reset_peak()
+            prof = cProfile.Profile()
+            started = time.perf_counter()
+            prof.enable()
+        except Exception as e:
+            logger.error(f"Профилирование этапа {name} пропущено: {e}")
+            yield
+            return
+        try:
+            yield
+        finally:
+            try:
+                prof.disable()
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot().filter_traces(ignore)
+                self._save_stage(name, prof, elapsed, peak, after.compare_to(before, "lineno"))
+            except Exception as e:
+                logger.error(f"Ошибка профилирования этапа {name}: {e}")
+
+    def _save_stage(self, name: str, prof: cProfile.Profile, elapsed: float, peak: int, diff: list):
+        safe = re.sub(r"[^\w.-]+", "_", name)
+        slug = f"{len(self._stages) + 1:02d}_{safe}"
+        try:
+            prof.dump_stats(os.path.join(self.run_dir, f"{slug}.prof"))
+            stats = pstats.Stats(prof)
+            with open(os.path.join(self.run_dir, f"{slug}.folded"), "w", encoding="utf-8") as f:
+                for stack, us in sorted(folded_stacks(stats).items()):
+                    f.write(f"{stack} {us}\n")
+        except Exception as e:
+            logger.error(f"Ошибка сохранения профиля {name}: {e}")
+        self._stages.append({
+            "name": name, "elapsed": elapsed, "peak": peak,
+            "allocated": sum(d.size_diff for d in diff),
+            "top": [d for d in diff if d.size_diff > 0][:self.top_n],
+        })
+
+    def finish(self) -> Optional[str]:
+        """Пишет summary.txt и останавливает tracemalloc. Возвращает путь к сводке."""
+        if not self.enabled or self.run_dir is None:
+            return None
+        if self._tracing:
+            _release_tracemalloc()
+            self._tracing = False
+
+        lines = [f"Профиль запуска парсера — {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}", ""]
+        lines.append(f"{'Этап':<40} {'Время, с':>10} {'Пик, КБ':>10} {'Δ память, КБ':>14}")
+        for s in self._stages:
+            lines.append(
+                f"{s['name'][:40]:<40} {s['elapsed']:>10.3f} "
+                f"{s['peak'] / 1024:>10.1f} {s['allocated'] / 1024:>14.1f}"
+            )
+        for s in self._stages:
+            if not s["top"]:
+                continue
+            lines += ["", f"─── {s['name']}: топ-{self.top_n} аллокаций ───"]
+            for d in s["top"]:
+                frame = d.traceback[0]
+                lines.append(f"{d.size_diff / 1024:>10.1f} КБ  {d.count_diff:>+7}  {frame.filename}:{frame.lineno}")
+
+        self.summary_file = os.path.join(self.run_dir, "summary.txt")
+        try:
+            with open(self.summary_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            logger.info(f"Профиль сохранён: {self.run_dir}")
+        except Exception as e:
+            logger.error(f"Ошибка сохранения сводки профиля: {e}")
+        return self.summary_file
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Архив HTML-отчётов
+- Отдельная датированная страница на каждый запуск
+- Постраничный индекс, статический JSON-индекс для поиска и страницы направлений
+- Перезаписываются только затронутые файлы: последняя страница индекса,
+  её поисковый шард и последние страницы направлений из текущего запуска
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+from contextlib import closing, contextmanager
+from datetime import datetime
+from html import escape
+from string import Template
+from typing import List, Dict, Iterable, Iterator
+
+from archive import connect as connect_archive
+from coordination import leased
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR    = os.path.dirname(os.path.abspath(__file__))
+REPORTS_DIR   = os.getenv("GRANTS_REPORTS_DIR", os.path.join(SCRIPT_DIR, "reports"))
+MANIFEST_FILE = os.path.join(REPORTS_DIR, "manifest.json")
+PENDING_DIR   = os.path.join(REPORTS_DIR, "pending")
+FAILED_DIR    = os.path.join(REPORTS_DIR, "failed")
+
+RUNS_PER_PAGE       = 30
+DIRECTION_PAGE_SIZE = 100
+REPORT_LEASE  = "report"
+# После стольких неудачных попыток запуск уходит в reports/failed/ и не держит очередь
+MAX_REPORT_ATTEMPTS = 3
+
+# ─── Шаблоны ──────────────────────────────────────────────────────────────────
+# Страница делится на head/tail, строки таблицы пишутся в файл потоком между ними.
+
+STYLE = """body{font-family:Arial,sans-serif;padding:20px;background:#f5f5f5}
+h1{background:linear-gradient(135deg,#667eea,#764ba2);color:white;padding:20px;border-radius:8px}
+table{width:100%;border-collapse:collapse;background:white;border-radius:8px;overflow:hidden;box-shadow:0 2px 8px rgba(0,0,0,0.1)}
+th{background:#667eea;color:white;padding:12px;text-align:left}
+td{padding:10px;border-bottom:1px solid #eee;vertical-align:top}
+tr:hover{background:#f9f9ff}
+a{color:#667eea}
+nav{margin:12px 0}
+nav a{margin-right:12px}
+.amount{color:green;font-weight:bold}
+#q{width:100%;padding:10px;font-size:16px;margin-bottom:12px}
+"""
+
+PAGE_HEAD = Template("""<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="UTF-8">
+<title>$title</title>
+<link rel="stylesheet" href="${root}style.css">
+</head>
+<body>
+<h1>🎯 $heading</h1>
+<nav>$nav</nav>
+<p>$subtitle</p>
+<table>
+<tr>$columns</tr>
+""")
+
+PAGE_TAIL = Template("""</table>
+<nav>$nav</nav>
+<p><i>🤖 Автоматический мониторинг грантов МГТУ</i></p>
+</body></html>
+""")
+
+GRANT_COLUMNS = "".join(f"<th>{c}</th>" for c in (
+    "#", "Название", "Организатор", "Финансирование", "Направление",
+    "Срок подачи", "Реализация", "Рейтинг", "Ссылка",
+))
+
+GRANT_ROW = Template("""<tr>
+<td>$n</td>
+<td><b>$title</b><br><small>$description</small></td>
+<td>$organizer</td>
+<td class="amount">$amount</td>
+<td><a href="${root}directions/$direction_slug.html">$direction</a></td>
+<td>$deadline</td>
+<td>$duration</td>
+<td>$stars</td>
+<td><a href="$url" target="_blank" rel="noopener">Открыть</a></td>
+</tr>
+""")
+
+RUN_COLUMNS = "<th>Дата</th><th>Грантов</th><th>Направления</th>"
+
+RUN_ROW = Template("""<tr>
+<td><a href="runs/$run_id.html">$date</a></td>
+<td>$count</td>
+<td>$directions</td>
+</tr>
+""")
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="UTF-8">
+<title>Поиск грантов МГТУ</title>
+<link rel="stylesheet" href="style.css">
+</head>
+<body>
+<h1>🔍 Поиск по архиву грантов</h1>
+<nav><a href="index.html">Последние запуски</a></nav>
+<input id="q" placeholder="Название, организатор или направление" autofocus>
+<table id="results"></table>
+<script>
+let items = [];
+fetch("search/meta.json").then(r => r.json()).then(meta =>
+  Promise.all(Array.from({length: meta.pages}, (_, i) =>
+    fetch(`search/page-${i + 1}.json`).then(r => r.json())))
+).then(shards => { items = shards.flat(); });
+const esc = s => String(s).replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+document.getElementById("q").addEventListener("input", e => {
+  const q = e.target.value.trim().toLowerCase();
+  const found = q ? items.filter(g => g.text.includes(q)).slice(0, 200) : [];
+  document.getElementById("results").innerHTML = found.map(g =>
+    `<tr><td><a href="${esc(g.page)}">${esc(g.date)}</a></td><td><b>${esc(g.title)}</b></td>` +
+    `<td>${esc(g.organizer)}</td><td class="amount">${esc(g.amount)}</td><td>${esc(g.direction)}</td></tr>`
+  ).join("");
+});
+</script>
+</body></html>
+"""
+
+# ─── Утилиты ──────────────────────────────────────────────────────────────────
+
+def direction_slug(direction: str) -> str:
+    return hashlib.md5(direction.encode()).hexdigest()[:10]
+
+def safe_url(url: str) -> str:
+    return escape(url) if url.startswith(("http://", "https://")) else "#"
+
+@contextmanager
+def open_atomic(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yield f
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def grant_rows(grants: Iterable[Dict], root: str) -> Iterator[str]:
+    for i, g in enumerate(grants, 1):
+        direction = g.get("direction", "")
+        yield GRANT_ROW.substitute(
+            n=i,
+            root=root,
+            title=escape(g["title"]),
+            description=escape(g.get("description", "")[:150]),
+            organizer=escape(g.get("organizer", "")),
+            amount=escape(g.get("amount", "")),
+            direction=escape(direction),
+            direction_slug=direction_slug(direction),
+            deadline=escape(g.get("deadline_info", "")),
+            duration=escape(g.get("project_duration", "")),
+            stars="⭐" * g.get("rating", 3),
+            url=safe_url(g.get("details_url", "")),
+        )
+
+def write_page(path: str, rows: Iterable[str], *, title: str, heading: str,
+               subtitle: str, nav: str, columns: str, root: str = ""):
+    with open_atomic(path) as f:
+        f.write(PAGE_HEAD.substitute(
+            title=escape(title), heading=escape(heading), subtitle=subtitle,
+            nav=nav, columns=columns, root=root,
+        ))
+        f.writelines(rows)
+        f.write(PAGE_TAIL.substitute(nav=nav))
+
+def load_manifest() -> Dict:
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"runs": [], "directions": {}}
+
+# ─── Части архива ─────────────────────────────────────────────────────────────
+
+def write_run_page(run: Dict, grants: List[Dict]):
+    nav = '<a href="../index.html">Все запуски</a><a href="../search.html">Поиск</a>'
+    write_page(
+        os.path.join(REPORTS_DIR, "runs", f"{run['id']}.html"),
+        grant_rows(grants, "../"),
+        title=f"Гранты МГТУ — {run['date']}",
+        heading="Гранты для МГТУ им. Баумана",
+        subtitle=f"📅 {escape(run['date'])} | Найдено грантов: <b>{len(grants)}</b>",
+        nav=nav, columns=GRANT_COLUMNS, root="../",
+    )
+
+def index_nav(page: int, pages: int) -> str:
+    links = ['<a href="search.html">🔍 Поиск</a>']
+    if page > 1:
+        links.append(f'<a href="page-{page - 1}.html">← Ранее</a>')
+    if page < pages:
+        links.append(f'<a href="page-{page + 1}.html">Позже →</a>')
+    if page != pages:
+        links.append('<a href="index.html">Последние</a>')
+    return "".join(links)
+
+def write_index_page(manifest: Dict, page: int):
+    runs = manifest["runs"][(page - 1) * RUNS_PER_PAGE:page * RUNS_PER_PAGE]
+    pages = (len(manifest["runs"]) + RUNS_PER_PAGE - 1) // RUNS_PER_PAGE
+    names = manifest["directions"]
+
+    def rows():
+        for run in reversed(runs):
+            yield RUN_ROW.substitute(
+                run_id=run["id"],
+                date=escape(run["date"]),
+                count=run["count"],
+                directions=", ".join(
+                    f'<a href="directions/{slug}.html">{escape(names[slug])}</a> ({n})'
+                    for slug, n in run["directions"].items()
+                ),
+            )
+
+    subtitle = f"Запусков в архиве: <b>{len(manifest['runs'])}</b> | страница {page} из {pages}"
+    for name in ([f"page-{page}.html", "index.html"] if page == pages else [f"page-{page}.html"]):
+        write_page(
+            os.path.join(REPORTS_DIR, name), rows(),
+            title="Гранты МГТУ — архив отчётов",
+            heading="Архив отчётов по грантам МГТУ им. Баумана",
+            subtitle=subtitle, nav=index_nav(page, pages), columns=RUN_COLUMNS,
+        )
+
+def append_search_shard(run: Dict, grants: List[Dict], page: int, pages: int):
+    path = os.path.join(REPORTS_DIR, "search", f"page-{page}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            shard = json.load(f)
+    except FileNotFoundError:
+        shard = []
+    # Повтор отложенного запуска не должен дублировать его записи
+    page_url = f"runs/{run['id']}.html"
+    shard = [entry for entry in shard if entry["page"] != page_url]
+    for g in grants:
+        shard.append({
+            "title": g["title"],
+            "organizer": g.get("organizer", ""),
+            "direction": g.get("direction", ""),
+            "amount": g.get("amount", ""),
+            "date": run["date"],
+            "page": page_url,
+            "text": " ".join((g["title"], g.get("organizer", ""), g.get("direction", ""))).lower(),
+        })
+    with open_atomic(path) as f:
+        json.dump(shard, f, ensure_ascii=False, separators=(",", ":"))
+    with open_atomic(os.path.join(REPORTS_DIR, "search", "meta.json")) as f:
+        json.dump({"pages": pages}, f)
+
+def direction_nav(slug: str, page: int, pages: int) -> str:
+    links = ['<a href="../index.html">Все запуски</a>', '<a href="../search.html">Поиск</a>']
+    if page > 1:
+        links.append(f'<a href="{slug}-{page - 1}.html">← Ранее</a>')
+    if page < pages:
+        links.append(f'<a href="{slug}-{page + 1}.html">Позже →</a>')
+        links.append(f'<a href="{slug}.html">Последние</a>')
+    return "".join(links)
+
+def write_direction_pages(manifest: Dict, slug: str):
+    """Дописывает страницы направления: грант попадает на страницу по порядку
+    публикации, так что переписываются только хвостовые страницы.
+    """
+    direction = manifest["directions"][slug]
+    rendered = manifest.setdefault("direction_counts", {}).get(slug, 0)
+    with closing(connect_archive()) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM grants WHERE direction = ?", (direction,)).fetchone()[0]
+        pages = max(1, (total + DIRECTION_PAGE_SIZE - 1) // DIRECTION_PAGE_SIZE)
+        # Последняя уже записанная страница тоже меняется: в ней дописываются строки или ссылка «Позже →»
+        first = max(1, (rendered + DIRECTION_PAGE_SIZE - 1) // DIRECTION_PAGE_SIZE)
+        for page in range(first, pages + 1):
+            rows = conn.execute(
+                "SELECT data FROM grants WHERE direction = ? ORDER BY posted_at, id LIMIT ? OFFSET ?",
+                (direction, DIRECTION_PAGE_SIZE, (page - 1) * DIRECTION_PAGE_SIZE),
+            ).fetchall()
+            grants = [json.loads(row["data"]) for row in reversed(rows)]
+            names = [f"{slug}-{page}.html"] + ([f"{slug}.html"] if page == pages else [])
+            for name in names:
+                write_page(
+                    os.path.join(REPORTS_DIR, "directions", name),
+                    grant_rows(grants, "../"),
+                    title=f"Гранты МГТУ — {direction}",
+                    heading=direction,
+                    subtitle=f"Грантов по направлению: <b>{total}</b> | страница {page} из {pages}",
+                    nav=direction_nav(slug, page, pages),
+                    columns=GRANT_COLUMNS, root="../",
+                )
+    manifest["direction_counts"][slug] = total
+
+# ─── Обновление архива ────────────────────────────────────────────────────────
+
+def update_reports(run: Dict, grants: List[Dict]):
+    manifest = load_manifest()
+    if any(r["id"] == run["id"] for r in manifest["runs"]):
+        # Манифест уже записан, упало только удаление отложенного файла
+        return
+    run["directions"] = {}
+    for g in grants:
+        direction = g.get("direction", "")
+        slug = direction_slug(direction)
+        manifest["directions"][slug] = direction
+        run["directions"][slug] = run["directions"].get(slug, 0) + 1
+
+    for name, text in (("style.css", STYLE), ("search.html", SEARCH_PAGE)):
+        if not os.path.exists(os.path.join(REPORTS_DIR, name)):
+            with open_atomic(os.path.join(REPORTS_DIR, name)) as f:
+                f.write(text)
+
+    write_run_page(run, grants)
+    manifest["runs"].append(run)
+    pages = (len(manifest["runs"]) + RUNS_PER_PAGE - 1) // RUNS_PER_PAGE
+
+    # Новая страница индекса — предыдущей нужна ссылка «Позже →»
+    if pages > 1 and len(manifest["runs"]) % RUNS_PER_PAGE == 1:
+        write_index_page(manifest, pages - 1)
+    write_index_page(manifest, pages)
+    append_search_shard(run, grants, pages, pages)
+    for slug in run["directions"]:
+        write_direction_pages(manifest, slug)
+
+    with open_atomic(MANIFEST_FILE) as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+def move_failed(path: str, reason: str):
+    os.makedirs(FAILED_DIR, exist_ok=True)
+    os.replace(path, os.path.join(FAILED_DIR, os.path.basename(path)))
+    logger.error(f"Запуск {os.path.basename(path)} перенесён в {FAILED_DIR}: {reason}")
+
+def drain_pending():
+    """Добавляет в архив все отложенные запуски по порядку. Вызывать под арендой.
+
+    Упавший запуск остаётся первым в очереди, пока не исчерпает
+    MAX_REPORT_ATTEMPTS попыток, затем переносится в reports/failed/.
+    """
+    for name in sorted(os.listdir(PENDING_DIR)):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(PENDING_DIR, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                pending = json.load(f)
+        except ValueError as e:
+            move_failed(path, f"битый файл: {e}")
+            continue
+        try:
+            update_reports(pending["run"], pending["grants"])
+        except Exception as e:
+            pending["attempts"] = pending.get("attempts", 0) + 1
+            if pending["attempts"] < MAX_REPORT_ATTEMPTS:
+                with open_atomic(path) as f:
+                    json.dump(pending, f, ensure_ascii=False)
+                raise
+            move_failed(path, f"{pending['attempts']} неудачных попыток, последняя ошибка: {e}")
+            continue
+        os.remove(path)
+
+def save_html_report(grants: List[Dict]):
+    """Добавляет запуск в архив отчётов reports/ (вместо перезаписи одного файла).
+
+    Запуск сначала кладётся в reports/pending/, поэтому если архив занят или
+    обновление упало, он будет добавлен при следующем обновлении (после
+    MAX_REPORT_ATTEMPTS неудач — перенесён в reports/failed/).
+    """
+    now = datetime.now()
+    run = {
+        "id": now.strftime("%Y%m%d-%H%M%S-%f"),
+        "date": now.strftime("%d.%m.%Y %H:%M"),
+        "count": len(grants),
+        "directions": {},
+    }
+    try:
+        with open_atomic(os.path.join(PENDING_DIR, f"{run['id']}.json")) as f:
+            json.dump({"run": run, "grants": grants}, f, ensure_ascii=False)
+
+        # Архив общий для всех воркеров — обновляем его по очереди
+        deadline = time.monotonic() + 60
+        while True:
+            with leased(REPORT_LEASE) as ok:
+                if ok:
+                    drain_pending()
+                    break
+            if time.monotonic() > deadline:
+                logger.warning("Архив отчётов занят другим воркером, запуск отложен до следующего обновления")
+                return
+            time.sleep(1)
+        logger.info(f"HTML отчёт сохранён: {REPORTS_DIR}")
+    except Exception as e:
+        logger.error(f"Ошибка HTML отчёта (запуск остался в {PENDING_DIR}): {e}")